@@ -1,25 +1,36 @@
 # __init__.py
 
+import time
 import logging
-import azure.functions as func
-from .coordinator import (
-    get_credentials,
-    get_target_dates, 
-    create_services,
-    start_browser,
-    wait_for_reservation_time,
-    refresh_calendar,
-    cleanup_browser
-)
-from .login_service import ILoginService, LoginService
-from .date_calculator import IDateCalculator, DateService
-from .reservation_service import IReservationService, ReservationService
-from .verification_service import IVerificationService, VerificationService
-from .notification_service import INotificationService
+from datetime import datetime
 
+try:
+    from azure.functions import TimerRequest
+except ImportError:
+    # Offline tools (policy replay, tests) import this package without the Functions runtime
+    TimerRequest = object
 
-def main(mytimer: func.TimerRequest) -> None:
+
+def main(mytimer: TimerRequest) -> None:
     """Main entry point showing high-level reservation process"""
+    # Imported here so fire_policy and run_history stay usable without playwright
+    from .coordinator import (
+        get_credentials,
+        get_target_dates,
+        create_services,
+        create_timing_services,
+        plan_fire_time,
+        get_fire_time,
+        get_poll_deadline,
+        start_browser,
+        wait_for_prewarm_time,
+        wait_for_reservation_time,
+        refresh_calendar,
+        cleanup_browser,
+        record_run
+    )
+    from .run_history import MISS_EXCEPTION, MISS_NOT_VERIFIED
+
     logging.info("=== ReserveParkalot timer trigger started ===")
     
     #  Get environment setup
@@ -31,25 +42,39 @@ def main(mytimer: func.TimerRequest) -> None:
     date_calculator, login_service, reservation_service, verification_service, notification_service = create_services(email, password)
     target_texts = get_target_dates(date_calculator)
     
+    # Pick today's fire time from previous runs
+    run_history, fire_policy = create_timing_services()
+    plan = plan_fire_time(run_history, fire_policy)
+    fire_time = get_fire_time(plan.fire_offset)
+    
+    # Wait until it is time to pre-warm the browser
+    wait_for_prewarm_time(fire_time, plan.prewarm_lead)
+    
     # Start browser session
+    prewarm_started = time.time()
     playwright_instance, browser, page = start_browser()
     
     reservation_success = False
     verification_success = False
     error_message = None
+    prewarm_seconds = None
+    fired_at = None
+    miss_reason = None
     
     try:
         # Login
         login_service.login(page)
+        prewarm_seconds = time.time() - prewarm_started
         
-        # Wait until 12:00:02
-        wait_for_reservation_time()
+        # Wait until the planned fire time
+        wait_for_reservation_time(fire_time)
+        fired_at = datetime.utcnow()
         
         # Refresh page 
         refresh_calendar(page)
         
-        # Attempt to reserve parking spot
-        reservation_success = reservation_service.reserve(page, target_texts)
+        # Attempt to reserve parking spot, reloading until RESERVE appears
+        reservation_success = reservation_service.reserve(page, target_texts, get_poll_deadline(fire_time, plan))
         
         if reservation_success:
             # Verify reservation was successful and get parking spot number
@@ -65,19 +90,27 @@ def main(mytimer: func.TimerRequest) -> None:
             else:
                 logging.warning("FAILED: Parking reservation could not be verified")
                 error_message = "Reservation appeared to succeed but could not be verified"
+                miss_reason = MISS_NOT_VERIFIED
                 notification_service.send_failure_notification(target_texts, error_message)
         else:
             logging.error("FAILED: Could not make parking reservation")
             error_message = "Could not find or click RESERVE button"
+            miss_reason = reservation_service.miss_reason
             notification_service.send_failure_notification(target_texts, error_message)
             
     except Exception as e:
         logging.error(f"Reservation process failed: {e}")
         error_message = str(e)
+        miss_reason = MISS_EXCEPTION
         notification_service.send_failure_notification(target_texts, error_message)
         
     finally:
         # cleanup resources
         cleanup_browser(playwright_instance, browser)
     
+    # Record timing and outcome so the next run's fire time can adapt
+    if fired_at is not None:
+        record_run(run_history, plan, fire_time, fired_at, prewarm_seconds,
+                   reservation_service, miss_reason, verification_success)
+    
     logging.info("=== ReserveParkalot timer trigger completed ===")
\ No newline at end of file
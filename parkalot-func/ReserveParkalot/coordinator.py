@@ -12,6 +12,8 @@ from .reservation_service import IReservationService, ReservationService
 from .verification_service import IVerificationService, VerificationService
 from .notification_service import INotificationService
 from .notification_factory import NotificationFactory
+from .run_history import IRunHistory, JsonRunHistory, RunRecord
+from .fire_policy import IFirePolicy, AdaptiveFirePolicy, FirePlan, MAX_FIRE_OFFSET
 
 
 # Change to False to avoid wait times for testing
@@ -57,19 +59,78 @@ def start_browser():
     return p, browser, page
 
 
-# Wait until 11:00:01 UTC (12:00:01 UK time) if ACTIVE is True
-def wait_for_reservation_time():
+# Create the run history and the policy that picks the next fire time from it
+def create_timing_services():
+    run_history: IRunHistory = JsonRunHistory()
+    fire_policy: IFirePolicy = AdaptiveFirePolicy()
+    return run_history, fire_policy
+
+
+# Choose today's fire offset and pre-warm lead from the recorded runs
+def plan_fire_time(run_history: IRunHistory, fire_policy: IFirePolicy) -> FirePlan:
+    plan = fire_policy.plan(run_history.load())
+    logging.info(f"Fire plan: 12:00:00 UTC + {plan.fire_offset:.1f}s, pre-warm {plan.prewarm_lead:.0f}s before")
+    return plan
+
+
+# Next 12:00:00 UTC plus the fire offset
+def get_fire_time(fire_offset: float) -> datetime:
+    now = datetime.utcnow()
+    fire_time = now.replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(seconds=fire_offset)
+    if fire_time <= now:
+        fire_time += timedelta(days=1)
+    return fire_time
+
+
+# Sleep until the given UTC time if ACTIVE is True
+def _sleep_until(target_time: datetime, reason: str):
     if ACTIVE:
-        now = datetime.utcnow()
-        # Set to 11:00:01 UTC (12:00:01 UK BST)
-        target_time = now.replace(hour=12, minute=0, second=13, microsecond=0)
-        if target_time <= now:
-            target_time += timedelta(days=1)
-        wait_secs = (target_time - now).total_seconds()
-        logging.info(f"Sleeping for {wait_secs:.0f}s until {target_time.time()} UTC (12:00:01 UK time)")
+        wait_secs = max(0.0, (target_time - datetime.utcnow()).total_seconds())
+        logging.info(f"Sleeping for {wait_secs:.0f}s until {target_time.time()} UTC ({reason})")
         time.sleep(wait_secs)
     else:
-        logging.info("ACTIVE=False: Skipping wait, running immediately for testing")
+        logging.info(f"ACTIVE=False: Skipping wait for {reason}, running immediately for testing")
+
+
+# Wait until the pre-warm lead before the fire time so the browser is logged in on time
+def wait_for_prewarm_time(fire_time: datetime, prewarm_lead: float):
+    _sleep_until(fire_time - timedelta(seconds=prewarm_lead), "pre-warm")
+
+
+# Wait until the fire time
+def wait_for_reservation_time(fire_time: datetime):
+    _sleep_until(fire_time, "fire time")
+
+
+# Keep reloading for RESERVE until the latest allowed fire offset (no polling when testing)
+def get_poll_deadline(fire_time: datetime, plan: FirePlan):
+    if not ACTIVE:
+        return None
+    return fire_time + timedelta(seconds=MAX_FIRE_OFFSET - plan.fire_offset)
+
+
+# Record timing and outcome so the next run's fire time can adapt (skipped when testing)
+def record_run(run_history: IRunHistory, plan: FirePlan, fire_time: datetime, fired_at: datetime,
+               prewarm_seconds: float, reservation_service: IReservationService, miss_reason: str, won: bool):
+    if not ACTIVE:
+        logging.info("ACTIVE=False: Not recording run outcome")
+        return
+
+    def delay(at):
+        return (at - fired_at).total_seconds() if at else None
+
+    noon = fire_time - timedelta(seconds=plan.fire_offset)
+    run_history.append(RunRecord(
+        run_date=noon.date().isoformat(),
+        planned_fire_offset=plan.fire_offset,
+        fire_offset=(fired_at - noon).total_seconds(),
+        prewarm_lead=plan.prewarm_lead,
+        prewarm_seconds=prewarm_seconds,
+        reserve_seen_delay=delay(reservation_service.reserve_seen_at),
+        reserve_missing_delay=delay(reservation_service.reserve_missing_at),
+        miss_reason=None if won else miss_reason,
+        won=won
+    ))
 
 
 # Reload the calendar page
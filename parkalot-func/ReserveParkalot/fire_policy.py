@@ -0,0 +1,205 @@
+# fire_policy.py
+
+import sys
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List
+
+from .run_history import RunRecord, JsonRunHistory
+
+
+# Fire time is 12:00:00 UTC plus the fire offset
+DEFAULT_FIRE_OFFSET = 13.0
+MIN_FIRE_OFFSET = 0.0
+MAX_FIRE_OFFSET = 30.0
+
+# Browser is started and logged in this many seconds before the fire time.
+# The latest trigger (function.json, 11:58 UTC) is 120s before 12:00:00 UTC.
+DEFAULT_PREWARM_LEAD = 120.0
+MIN_PREWARM_LEAD = 45.0
+MAX_PREWARM_LEAD = 120.0
+
+
+@dataclass
+class FirePlan:
+    """When to start the browser and when to fire for the next run"""
+    fire_offset: float     # Seconds after 12:00:00 UTC
+    prewarm_lead: float    # Seconds before the fire time
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+# Fire policy interface
+class IFirePolicy(ABC):
+    @abstractmethod
+    def plan(self, history: List[RunRecord]) -> FirePlan:
+        """Choose the next run's timing from the recorded runs, oldest first"""
+        pass
+
+
+class FixedFirePolicy(IFirePolicy):
+    """Always fires at the same time, ignoring history"""
+
+    def __init__(self, fire_offset: float = DEFAULT_FIRE_OFFSET, prewarm_lead: float = DEFAULT_PREWARM_LEAD):
+        self._plan = FirePlan(fire_offset, prewarm_lead)
+
+    def plan(self, history: List[RunRecord]) -> FirePlan:
+        return self._plan
+
+
+class AdaptiveFirePolicy(IFirePolicy):
+    """
+    Tracks the RESERVE release time from recent runs and sizes the pre-warm
+    lead from recent login times, within fixed safety bounds. Runs that raised,
+    missed the target card or found it already booked are ignored.
+
+    The reservation service keeps reloading until RESERVE appears, so firing
+    early usually only costs reload latency while firing late can lose the spot:
+    - Polled through the release: fire just after the last load without RESERVE
+    - RESERVE there on the first load and won: fire slightly earlier, but never
+      back below a release observed before
+    - Missed having fired before the last winning click: fire just after the
+      last load without RESERVE
+    - Lost the click, or missed at or after the last winning click: fire earlier
+    - Missing without a recent win: fire earlier, starting over from the default
+      once the earliest offset has been tried
+
+    Early and late are judged on when runs actually fired, not when they were planned.
+    """
+
+    def __init__(self, window: int = 14, step_up: float = 0.5, step_down: float = 1.0,
+                 probe: float = 0.5, lead_factor: float = 1.5, lead_margin: float = 20.0):
+        self._window = window
+        self._step_up = step_up
+        self._step_down = step_down
+        self._probe = probe
+        self._lead_factor = lead_factor
+        self._lead_margin = lead_margin
+
+    def plan(self, history: List[RunRecord]) -> FirePlan:
+        timing_runs = [r for r in history if r.is_timing_evidence]
+        return FirePlan(self._next_fire_offset(timing_runs), self._next_prewarm_lead(history[-self._window:]))
+
+    def _next_fire_offset(self, timing_runs: List[RunRecord]) -> float:
+        if not timing_runs:
+            return DEFAULT_FIRE_OFFSET
+
+        recent = timing_runs[-self._window:]
+        last = recent[-1]
+        win_clicks = [r.reserve_seen_offset for r in recent if r.won]
+        last_win_click = win_clicks[-1] if win_clicks else None
+
+        def fired_before_release(r: RunRecord) -> bool:
+            # First load had no RESERVE, earlier than a winning click: not released yet
+            return (not r.won and r.reserve_missing_offset is not None
+                    and last_win_click is not None and r.fire_offset < last_win_click)
+
+        # Loads known to be before release: the last one before polling saw it appear, or
+        # the first load of a miss that fired too early. Kept for the whole history so a
+        # probe that lost a day is never repeated.
+        released_after = [r.reserve_missing_offset for r in timing_runs if r.release_bracketed]
+        released_after += [r.fire_offset for r in timing_runs if fired_before_release(r)]
+
+        if last.release_bracketed:
+            offset = min(last.reserve_missing_offset + self._step_up, last.reserve_seen_offset)
+        elif last.won:
+            offset = last.planned_fire_offset - self._probe
+            if released_after:
+                # Probing below a release we have already seen only adds reload latency
+                offset = max(offset, max(released_after) + self._step_up)
+        elif fired_before_release(last):
+            # The spots went between reloads
+            offset = min(last.fire_offset + self._step_up, last_win_click)
+        elif last_win_click is None and last.planned_fire_offset <= MIN_FIRE_OFFSET:
+            offset = DEFAULT_FIRE_OFFSET
+        else:
+            offset = last.planned_fire_offset - self._step_down
+
+        return _clamp(offset, MIN_FIRE_OFFSET, MAX_FIRE_OFFSET)
+
+    def _next_prewarm_lead(self, recent: List[RunRecord]) -> float:
+        durations = [r.prewarm_seconds for r in recent if r.prewarm_seconds is not None]
+        if not durations:
+            return DEFAULT_PREWARM_LEAD
+
+        lead = max(durations) * self._lead_factor + self._lead_margin
+        return _clamp(lead, MIN_PREWARM_LEAD, MAX_PREWARM_LEAD)
+
+
+def _judge(fire_offset: float, run: RunRecord, tolerance: float) -> str:
+    """Judge a counterfactual fire offset against the click recorded for that day"""
+    if not run.is_timing_evidence:
+        return "ignored"
+
+    # When the recorded run clicked, or gave up with RESERVE never seen
+    acted_at = run.reserve_seen_offset if run.reserve_seen_offset is not None else run.fire_offset
+    if abs(fire_offset - acted_at) <= tolerance:
+        return "known_win" if run.won else "known_loss"
+    if not run.won and fire_offset > acted_at:
+        # RESERVE was already lost or gone; arriving later would not have helped
+        return "known_loss"
+    return "unknown"
+
+
+def _against_release(fire_offset: float, run: RunRecord) -> str:
+    """Where a fire offset falls relative to a recorded release bracket"""
+    if fire_offset <= run.reserve_missing_offset:
+        return "before_release"
+    if fire_offset <= run.reserve_seen_offset:
+        return "at_release"
+    return "after_release"
+
+
+def replay(history: List[RunRecord], policy: IFirePolicy, tolerance: float = 0.1) -> Dict[str, float]:
+    """
+    Replay recorded runs through a policy, letting it see only the runs before each day
+
+    Offsets within the tolerance of the recorded click are judged by that day's outcome.
+    On days where polling bracketed the release, the offset is also placed before, at
+    or after the release.
+
+    Returns:
+        Dict[str, float]: counts of known wins, known losses, unknown and ignored outcomes,
+                          counts relative to recorded releases, plus the mean fire offset
+                          and pre-warm lead chosen
+    """
+    results = {
+        "known_win": 0, "known_loss": 0, "unknown": 0, "ignored": 0,
+        "before_release": 0, "at_release": 0, "after_release": 0,
+    }
+    offsets = []
+    leads = []
+
+    for i, run in enumerate(history):
+        plan = policy.plan(history[:i])
+        results[_judge(plan.fire_offset, run, tolerance)] += 1
+        if run.is_timing_evidence and run.release_bracketed:
+            results[_against_release(plan.fire_offset, run)] += 1
+        offsets.append(plan.fire_offset)
+        leads.append(plan.prewarm_lead)
+
+    results["mean_fire_offset"] = sum(offsets) / len(offsets) if offsets else 0.0
+    results["mean_prewarm_lead"] = sum(leads) / len(leads) if leads else 0.0
+    return results
+
+
+# Compare policies against a recorded history (no playwright or Functions runtime needed):
+#   python -m ReserveParkalot.fire_policy [path/to/run_history.jsonl]
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    history = JsonRunHistory(sys.argv[1] if len(sys.argv) > 1 else None).load()
+
+    policies = {
+        "fixed": FixedFirePolicy(),
+        "adaptive": AdaptiveFirePolicy(),
+    }
+    print(f"Replaying {len(history)} recorded run(s)")
+    for name, policy in policies.items():
+        results = replay(history, policy)
+        print(f"{name:>10}: " + ", ".join(
+            f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in results.items()
+        ))
@@ -3,20 +3,57 @@
 import os
 import time
 import logging
+from datetime import datetime
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from playwright.sync_api import Page
 
+from .run_history import MISS_CARD_NOT_FOUND, MISS_ALREADY_BOOKED, MISS_BUTTON_MISSING
+
 
 class IReservationService(ABC):
+    # UTC time of the first page load that showed a RESERVE button in the last reserve() call
+    reserve_seen_at: Optional[datetime] = None
+    # UTC time of the last page load whose target card had no RESERVE button
+    reserve_missing_at: Optional[datetime] = None
+    # Why the last reserve() call did not click RESERVE (one of the run_history MISS_* values)
+    miss_reason: Optional[str] = None
 
     @abstractmethod
-    def reserve(self, page: Page, target_date_texts: List[str]) -> bool:
+    def reserve(self, page: Page, target_date_texts: List[str], poll_until: Optional[datetime] = None) -> bool:
         pass
 
 
 class ReservationService(IReservationService):
-    def reserve(self, page: Page, target_date_texts: List[str]) -> bool:
+    def reserve(self, page: Page, target_date_texts: List[str], poll_until: Optional[datetime] = None) -> bool:
+        self.reserve_seen_at = None
+        self.reserve_missing_at = None
+
+        # The calendar has just been reloaded for the first attempt
+        loaded_at = datetime.utcnow()
+        while True:
+            if self._try_reserve(page, target_date_texts):
+                self.reserve_seen_at = loaded_at
+                return True
+
+            # Only a found card without RESERVE is worth reloading for: it may not be released yet
+            if self.miss_reason != MISS_BUTTON_MISSING:
+                break
+            self.reserve_missing_at = loaded_at
+            if poll_until is None or datetime.utcnow() >= poll_until:
+                break
+
+            logging.info("RESERVE not available yet; reloading calendar")
+            page.reload()
+            loaded_at = datetime.utcnow()
+
+        # No RESERVE button found or clicked
+        logging.error(f"Could not find a RESERVE button for any of {target_date_texts} ({self.miss_reason})")
+        return False
+
+    def _try_reserve(self, page: Page, target_date_texts: List[str]) -> bool:
+        self.miss_reason = MISS_CARD_NOT_FOUND
+
         # Click ALL DAYS to reveal full calendar
         logging.info("Clicking 'ALL DAYS' to reveal full calendar")
         page.click('button:has-text("ALL DAYS")', timeout=10000)
@@ -40,6 +77,13 @@ class ReservationService(IReservationService):
                 logging.info(f"Found matching card (index {i}) for {target_date_texts}")
                 logging.info(f"Card text: {card_text.replace(chr(10), ' | ')}")
 
+                # A RELEASE button means we already hold this date
+                if card.locator('button:has-text("RELEASE")').count() > 0:
+                    logging.info(f"Card {i} already has a RELEASE button; date already booked")
+                    self.miss_reason = MISS_ALREADY_BOOKED
+                elif self.miss_reason == MISS_CARD_NOT_FOUND:
+                    self.miss_reason = MISS_BUTTON_MISSING
+
                 # Look for RESERVE buttons in this card
                 reserve_buttons = card.locator('button:has-text("RESERVE")')
                 count_btns = reserve_buttons.count()
@@ -52,6 +96,7 @@ class ReservationService(IReservationService):
                     logging.info(f"Button {j} text: {btn_text}")
 
                     if "reserve" in btn_text.lower():
+                        self.miss_reason = None
                         logging.info(f"Force-clicking 'RESERVE' (card {i}, button {j})")
                         btn.evaluate("el => el.click()")
 
@@ -62,6 +107,4 @@ class ReservationService(IReservationService):
 
                 logging.info(f"No RESERVE clicked in card {i}, moving on")
 
-        # No RESERVE button found or clicked
-        logging.error(f"Could not find a RESERVE button for any of {target_date_texts}")
         return False
\ No newline at end of file
@@ -0,0 +1,108 @@
+# run_history.py
+
+import os
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict, fields
+from typing import List, Optional
+
+
+# Default location of the run history when PARKALOT_HISTORY_FILE is not set. The home
+# directory is writable in both the container and Azure Functions (where /home persists).
+DEFAULT_HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".parkalot", "run_history.jsonl")
+
+# Why a run did not win
+MISS_EXCEPTION = "exception"              # Run raised after firing (e.g. a click timed out)
+MISS_CARD_NOT_FOUND = "card_not_found"    # No card for the target date on the page
+MISS_ALREADY_BOOKED = "already_booked"    # Target date already reserved by us
+MISS_BUTTON_MISSING = "button_missing"    # Target card found but it had no RESERVE button
+MISS_NOT_VERIFIED = "not_verified"        # RESERVE was clicked but the booking could not be verified
+
+# Misses that say nothing about whether we fired too early or too late
+NON_TIMING_MISSES = (MISS_EXCEPTION, MISS_CARD_NOT_FOUND, MISS_ALREADY_BOOKED)
+
+
+@dataclass
+class RunRecord:
+    """Timing and outcome of a single reservation run"""
+    run_date: str                                   # UTC date of the fire time, e.g. "2025-06-16"
+    planned_fire_offset: float                      # Seconds after 12:00:00 UTC the policy planned to fire
+    fire_offset: float                              # Seconds after 12:00:00 UTC we actually fired
+    prewarm_lead: float                             # Seconds before the fire time that the browser was started
+    prewarm_seconds: Optional[float] = None         # Time taken to start the browser and log in
+    reserve_seen_delay: Optional[float] = None      # Seconds after firing that the first load showing RESERVE was made
+    reserve_missing_delay: Optional[float] = None   # Seconds after firing of the last load whose target card had no RESERVE
+    miss_reason: Optional[str] = None               # One of the MISS_* values, None when won
+    won: bool = False                               # Reservation was verified
+
+    @property
+    def is_timing_evidence(self) -> bool:
+        """True if the outcome says something about the fire time"""
+        return self.miss_reason not in NON_TIMING_MISSES
+
+    @property
+    def reserve_seen_offset(self) -> Optional[float]:
+        """Seconds after 12:00:00 UTC that RESERVE was first seen"""
+        return None if self.reserve_seen_delay is None else self.fire_offset + self.reserve_seen_delay
+
+    @property
+    def reserve_missing_offset(self) -> Optional[float]:
+        """Seconds after 12:00:00 UTC that RESERVE was last seen missing"""
+        return None if self.reserve_missing_delay is None else self.fire_offset + self.reserve_missing_delay
+
+    @property
+    def release_bracketed(self) -> bool:
+        """True if polling saw RESERVE missing and then appear, so release lies between the two"""
+        return self.reserve_missing_delay is not None and self.reserve_seen_delay is not None
+
+
+# Run history interface
+class IRunHistory(ABC):
+    @abstractmethod
+    def load(self) -> List[RunRecord]:
+        """Return all recorded runs, oldest first"""
+        pass
+
+    @abstractmethod
+    def append(self, record: RunRecord) -> None:
+        """Record the outcome of a run"""
+        pass
+
+
+class JsonRunHistory(IRunHistory):
+    """Run history stored as one JSON object per line"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path or os.environ.get("PARKALOT_HISTORY_FILE") or DEFAULT_HISTORY_FILE
+
+    def load(self) -> List[RunRecord]:
+        if not os.path.exists(self._path):
+            logging.warning(f"No run history found at {self._path}; fire timing will use its defaults")
+            return []
+
+        known_fields = {f.name for f in fields(RunRecord)}
+        records = []
+        with open(self._path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                    records.append(RunRecord(**{k: v for k, v in data.items() if k in known_fields}))
+                except (ValueError, TypeError, AttributeError) as e:
+                    # Skip corrupt lines rather than losing the whole history
+                    logging.warning(f"Skipping unreadable run history line {line_number}: {e}")
+
+        logging.info(f"Loaded {len(records)} run(s) from {self._path}")
+        return records
+
+    def append(self, record: RunRecord) -> None:
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(record)) + "\n")
+            logging.info(f"Recorded run outcome to {self._path}: {record}")
+        except OSError as e:
+            logging.error(f"Could not record run outcome to {self._path}: {e}")
@@ -20,6 +20,11 @@ fi
 : "${TAG:?}"              # Docker image tag
 : "${CONTAINER_NAME:=parkalot-cron}"  # Azure Container Instance name
 
+# Optional: Azure Files share that keeps the run history across redeploys and restarts
+: "${STORAGE_ACCOUNT:=}"              # Storage account name
+: "${STORAGE_KEY:=}"                  # Storage account key
+: "${HISTORY_SHARE:=parkalot-history}"  # File share name
+
 # Login to ACR
 echo "→ Logging into ACR $ACR..."
 az acr login --name "$ACR"
@@ -58,6 +63,27 @@ if [ -n "${TWILIO_TO_NUMBER:-}" ]; then
   ENV_VARS="$ENV_VARS TWILIO_TO_NUMBER=$TWILIO_TO_NUMBER"
 fi
 
+# Keep the run history on an Azure Files share so it survives redeploys and restarts.
+# Without a share the history lives in the container and is lost every time it is recreated.
+HISTORY_VOLUME_ARGS=()
+if [ -n "$STORAGE_ACCOUNT" ] && [ -n "$STORAGE_KEY" ]; then
+  echo "→ Ensuring file share $HISTORY_SHARE exists in $STORAGE_ACCOUNT..."
+  az storage share create \
+    --name "$HISTORY_SHARE" \
+    --account-name "$STORAGE_ACCOUNT" \
+    --account-key "$STORAGE_KEY" \
+    --output none
+  HISTORY_VOLUME_ARGS=(
+    --azure-file-volume-account-name "$STORAGE_ACCOUNT"
+    --azure-file-volume-account-key "$STORAGE_KEY"
+    --azure-file-volume-share-name "$HISTORY_SHARE"
+    --azure-file-volume-mount-path /mnt/parkalot
+  )
+  ENV_VARS="$ENV_VARS PARKALOT_HISTORY_FILE=/mnt/parkalot/run_history.jsonl"
+else
+  echo "  → STORAGE_ACCOUNT/STORAGE_KEY not set: run history will be lost on every redeploy or restart"
+fi
+
 # Create or recreate container instance
 echo "→ Creating container group $CONTAINER_NAME..."
 az container create \
@@ -70,6 +96,7 @@ az container create \
   --cpu 0.5 --memory 1 \
   --os-type Linux \
   --restart-policy OnFailure \
+  ${HISTORY_VOLUME_ARGS[@]+"${HISTORY_VOLUME_ARGS[@]}"} \
   --environment-variables $ENV_VARS
 
 echo " "
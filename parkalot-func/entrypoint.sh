@@ -7,6 +7,13 @@ echo "Environment variables set:"
 env | grep -E 'PARKALOT|PLAYWRIGHT_BROWSERS_PATH|TWILIO' || true
 echo
 
+# Without PARKALOT_HISTORY_FILE the run history goes to ~/.parkalot in the container,
+# which is wiped on every redeploy or restart. deploy.sh points it at an Azure Files
+# share when STORAGE_ACCOUNT/STORAGE_KEY are set.
+if [ -z "${PARKALOT_HISTORY_FILE:-}" ]; then
+  echo "PARKALOT_HISTORY_FILE not set: run history is ephemeral"
+fi
+
 # Make sure the log file exists
 touch /var/log/parkalot.log
 
@@ -23,6 +30,7 @@ TWILIO_SID=${TWILIO_SID:-}
 TWILIO_AUTH_TOKEN=${TWILIO_AUTH_TOKEN:-}
 TWILIO_FROM_NUMBER=${TWILIO_FROM_NUMBER:-}
 TWILIO_TO_NUMBER=${TWILIO_TO_NUMBER:-}
+PARKALOT_HISTORY_FILE=${PARKALOT_HISTORY_FILE:-}
 57 11 * * *   root  /app/run_reservation.sh
 CRON
 
@@ -0,0 +1,193 @@
+# test_fire_policy.py
+
+import os
+import json
+import tempfile
+import unittest
+from typing import List
+
+from ReserveParkalot.fire_policy import (
+    AdaptiveFirePolicy,
+    FixedFirePolicy,
+    DEFAULT_FIRE_OFFSET,
+    MAX_FIRE_OFFSET,
+    replay,
+)
+from ReserveParkalot.run_history import (
+    RunRecord,
+    JsonRunHistory,
+    MISS_BUTTON_MISSING,
+    MISS_CARD_NOT_FOUND,
+    MISS_ALREADY_BOOKED,
+    MISS_EXCEPTION,
+    MISS_NOT_VERIFIED,
+)
+
+
+def _record(planned: float, won: bool = False, miss_reason: str = MISS_BUTTON_MISSING,
+            actual: float = None, seen: float = None, missing: float = None) -> RunRecord:
+    """Build a run; seen and missing are offsets after 12:00:00 UTC, like planned and actual"""
+    fire_offset = planned if actual is None else actual
+    if won and seen is None:
+        seen = fire_offset
+    return RunRecord(
+        run_date="2025-06-16",
+        planned_fire_offset=planned,
+        fire_offset=fire_offset,
+        prewarm_lead=120.0,
+        prewarm_seconds=40.0,
+        reserve_seen_delay=None if seen is None else seen - fire_offset,
+        reserve_missing_delay=None if missing is None else missing - fire_offset,
+        miss_reason=None if won else miss_reason,
+        won=won,
+    )
+
+
+def _simulate(policy, release: float, gone: float, days: int, reload_every: float = 6.0) -> List[RunRecord]:
+    """
+    RESERVE is on the card from release until the spots are gone. Like the reservation
+    service, each run reloads every reload_every seconds until RESERVE appears or the
+    poll deadline (MAX_FIRE_OFFSET) passes, and wins if it sees RESERVE.
+    """
+    history = []
+    for _ in range(days):
+        offset = policy.plan(history).fire_offset
+        loaded_at, missing, seen = offset, None, None
+        while True:
+            if release <= loaded_at < gone:
+                seen = loaded_at
+                break
+            missing = loaded_at
+            if loaded_at >= MAX_FIRE_OFFSET:
+                break
+            loaded_at += reload_every
+        history.append(_record(offset, won=seen is not None, seen=seen, missing=missing))
+    return history
+
+
+class AdaptiveFirePolicyTests(unittest.TestCase):
+
+    def test_no_history_uses_default(self):
+        plan = AdaptiveFirePolicy().plan([])
+        self.assertEqual(plan.fire_offset, DEFAULT_FIRE_OFFSET)
+
+    def test_never_loses_a_day_to_probing(self):
+        history = _simulate(AdaptiveFirePolicy(), release=5.0, gone=20.0, days=120)
+        self.assertTrue(all(r.won for r in history))
+
+    def test_settles_just_after_release(self):
+        history = _simulate(AdaptiveFirePolicy(), release=5.0, gone=20.0, days=60)
+        offsets = [r.planned_fire_offset for r in history[-30:]]
+        self.assertGreaterEqual(min(offsets), 4.5)
+        self.assertLessEqual(max(offsets), 6.0)
+
+    def test_finds_window_when_spots_gone_before_default(self):
+        history = _simulate(AdaptiveFirePolicy(), release=3.0, gone=5.0, days=40)
+        self.assertTrue(all(r.won for r in history[-20:]))
+
+    def test_finds_window_earlier_than_default(self):
+        history = _simulate(AdaptiveFirePolicy(), release=10.0, gone=11.0, days=30)
+        self.assertTrue(all(r.won for r in history[-20:]))
+
+    def test_follows_release_later_than_default(self):
+        history = _simulate(AdaptiveFirePolicy(), release=25.0, gone=30.0, days=60)
+        self.assertTrue(all(r.won for r in history[-30:]))
+        self.assertGreater(history[-1].planned_fire_offset, 20.0)
+
+    def test_restarts_from_default_without_a_win(self):
+        history = _simulate(AdaptiveFirePolicy(), release=99.0, gone=99.0, days=40)
+        offsets = [r.planned_fire_offset for r in history]
+        self.assertEqual(offsets[:15], [13.0 - i for i in range(14)] + [DEFAULT_FIRE_OFFSET])
+
+    def test_non_timing_misses_are_ignored(self):
+        history = [
+            _record(13.0, miss_reason=MISS_EXCEPTION),
+            _record(13.0, miss_reason=MISS_CARD_NOT_FOUND),
+            _record(13.0, miss_reason=MISS_ALREADY_BOOKED),
+        ]
+        self.assertEqual(AdaptiveFirePolicy().plan(history).fire_offset, DEFAULT_FIRE_OFFSET)
+
+    def test_steps_from_planned_not_actual_offset(self):
+        history = [_record(12.0, won=True, actual=40.0)]
+        self.assertEqual(AdaptiveFirePolicy().plan(history).fire_offset, 11.5)
+
+    def test_late_miss_is_not_read_as_too_early(self):
+        history = [_record(12.0, won=True), _record(11.5, actual=40.0)]
+        self.assertEqual(AdaptiveFirePolicy().plan(history).fire_offset, 10.5)
+
+    def test_lost_click_fires_earlier(self):
+        history = [_record(12.0, won=True), _record(11.5, miss_reason=MISS_NOT_VERIFIED, seen=11.5)]
+        self.assertEqual(AdaptiveFirePolicy().plan(history).fire_offset, 10.5)
+
+    def test_fires_just_after_last_load_without_reserve(self):
+        history = [_record(9.0, won=True, missing=9.0, seen=15.0)]
+        self.assertEqual(AdaptiveFirePolicy().plan(history).fire_offset, 9.5)
+
+    def test_does_not_probe_below_observed_release(self):
+        history = [_record(9.0, won=True, missing=9.0, seen=15.0), _record(9.5, won=True)]
+        self.assertEqual(AdaptiveFirePolicy().plan(history).fire_offset, 9.5)
+
+    def test_prewarm_lead_follows_login_time(self):
+        plan = AdaptiveFirePolicy().plan([_record(13.0, won=True)])
+        self.assertEqual(plan.prewarm_lead, 80.0)
+
+
+class ReplayTests(unittest.TestCase):
+
+    def test_untried_offsets_are_unknown(self):
+        # Recorded by the fixed policy: the adaptive policy only matches it on day one
+        history = [_record(13.0, won=True) for _ in range(30)]
+
+        adaptive = replay(history, AdaptiveFirePolicy())
+        fixed = replay(history, FixedFirePolicy())
+
+        self.assertEqual((adaptive["known_win"], adaptive["unknown"]), (1, 29))
+        self.assertEqual((fixed["known_win"], fixed["unknown"]), (30, 0))
+
+    def test_tolerance_edge(self):
+        history = [_record(13.0, won=True)]
+        self.assertEqual(replay(history, FixedFirePolicy(13.1))["known_win"], 1)
+        self.assertEqual(replay(history, FixedFirePolicy(13.5))["unknown"], 1)
+
+    def test_later_than_a_loss_is_known_loss(self):
+        history = [
+            _record(13.0, miss_reason=MISS_NOT_VERIFIED, seen=13.0),
+            _record(13.0),
+        ]
+        self.assertEqual(replay(history, FixedFirePolicy(15.0))["known_loss"], 2)
+        self.assertEqual(replay(history, FixedFirePolicy(11.0))["unknown"], 2)
+
+    def test_offsets_placed_against_recorded_release(self):
+        history = [_record(4.0, won=True, missing=10.0, seen=16.0)]
+        for offset, key in ((8.0, "before_release"), (12.0, "at_release"), (18.0, "after_release")):
+            self.assertEqual(replay(history, FixedFirePolicy(offset))[key], 1)
+
+    def test_non_timing_runs_are_ignored(self):
+        history = [_record(13.0, miss_reason=MISS_EXCEPTION), _record(13.0, won=True)]
+        results = replay(history, FixedFirePolicy())
+        self.assertEqual(results["ignored"], 1)
+        self.assertEqual(results["known_win"], 1)
+
+
+class JsonRunHistoryTests(unittest.TestCase):
+
+    def test_round_trip_skips_unreadable_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history", "run_history.jsonl")
+            history = JsonRunHistory(path)
+            history.append(_record(13.0, won=True, missing=7.0, seen=13.0))
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("not json\n")
+                f.write(json.dumps({"run_date": "2025-06-17"}) + "\n")
+            history.append(_record(12.5))
+
+            records = history.load()
+
+        self.assertEqual([r.planned_fire_offset for r in records], [13.0, 12.5])
+        self.assertTrue(records[0].release_bracketed)
+        self.assertEqual(records[0].reserve_missing_offset, 7.0)
+        self.assertEqual(records[1].miss_reason, MISS_BUTTON_MISSING)
+
+
+if __name__ == "__main__":
+    unittest.main()